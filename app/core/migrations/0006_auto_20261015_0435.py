@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-15 04:35
+
+from django.db import migrations, models
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge tags and ingredients a user has more than once by name.
+
+    Recipes are moved over to the row with the lowest id of each
+    (user, name) pair, then the other rows are deleted.
+    """
+    Recipe = apps.get_model('core', 'Recipe')
+    for field_name in ['tags', 'ingredients']:
+        field = Recipe._meta.get_field(field_name)
+        model = field.related_model
+        through = field.remote_field.through
+        column = f'{model._meta.model_name}_id'
+        duplicates = model.objects.values('user', 'name').annotate(
+            keep_id=models.Min('id'),
+            total=models.Count('id'),
+        ).filter(total__gt=1)
+        for duplicate in duplicates:
+            keep_id = duplicate['keep_id']
+            merge_ids = list(model.objects.filter(
+                user=duplicate['user'],
+                name=duplicate['name'],
+            ).exclude(id=keep_id).values_list('id', flat=True))
+            linked = set(through.objects.filter(
+                **{column: keep_id},
+            ).values_list('recipe_id', flat=True))
+            moved = set(through.objects.filter(
+                **{f'{column}__in': merge_ids},
+            ).values_list('recipe_id', flat=True)) - linked
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{column: keep_id})
+                for recipe_id in moved
+            ])
+            # deleting the rows cascades to their remaining recipe links
+            model.objects.filter(id__in=merge_ids).delete()
+
+
+class Migration(migrations.Migration):
+    # commit the merge before adding the constraints; Postgres refuses to
+    # alter tables with pending deferred foreign key checks
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_names,
+            migrations.RunPython.noop,
+            atomic=True,
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_ingredient_user_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_tag_user_name'),
+        ),
+    ]
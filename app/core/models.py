@@ -56,6 +56,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class RecipeManager(models.Manager):
+    """Manager for recipes."""
+
+    def for_user(self, user):
+        """Return the user's recipes."""
+        return self.filter(user=user)
+
+
 class Recipe(models.Model):
     """Recipe object."""
     user = models.ForeignKey(
@@ -71,6 +79,8 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    objects = RecipeManager()
+
     def __str__(self):
         """Return string representation of the recipe."""
         return self.title
@@ -78,23 +88,47 @@ class Recipe(models.Model):
 
 class Tag(models.Model):
     """Tag for filtering recipes."""
-    name = models.CharField(max_length=255)
+    # bytewise collation keeps sorting by name cheap; note that uppercase
+    # names sort before lowercase ones
+    name = models.CharField(max_length=255, db_collation='C')
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            # lets recipes upsert their tags by name; its index also
+            # serves listing a user's tags by -name (scanned backward)
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_user_name',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 
 class Ingredient(models.Model):
     """Ingredient for recipes."""
-    name = models.CharField(max_length=255)
+    # bytewise collation keeps sorting by name cheap; note that uppercase
+    # names sort before lowercase ones
+    name = models.CharField(max_length=255, db_collation='C')
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = [
+            # lets recipes upsert their ingredients by name; its index also
+            # serves listing a user's ingredients by -name (scanned backward)
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_user_name',
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,34 @@
+"""
+Renderers for the APIs.
+"""
+import orjson
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render JSON with orjson instead of the standard library encoder.
+
+    orjson encodes dicts, lists, strings and numbers in C; anything else,
+    such as lazy translations or decimals, falls back to DRF's encoder.
+    """
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data into a JSON bytestring."""
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson only supports an indent of two spaces
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=self.encoder_class().default,
+                           option=option)
+
+        # keep the output a strict javascript subset, like JSONRenderer
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
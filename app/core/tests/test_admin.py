@@ -3,7 +3,11 @@ Tests for the Django admin modifications.
 """
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.urls import reverse, reverse_lazy
+
+
+USERS_URL = reverse_lazy('admin:core_user_changelist')
+ADD_USER_URL = reverse_lazy('admin:core_user_add')
 
 
 class AdminSiteTests(TestCase):
@@ -11,40 +15,47 @@ class AdminSiteTests(TestCase):
     Tests for the Django admin modifications.
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """
-        Create user and client.
+        Create users once for the whole test case.
         """
-        self.client = Client()
-        self.admin_user = get_user_model().objects.create_superuser(
+        cls.admin_user = get_user_model().objects.create_superuser(
             email='admin@example.com',
             password='password123'
         )
-        self.client.force_login(self.admin_user)
-        self.user = get_user_model().objects.create_user(
+        cls.user = get_user_model().objects.create_user(
             email='user@example.com',
             password='password123',
             name='Test User'
         )
+        # the user id is fixed for the whole test case, so resolve it once
+        cls.change_user_url = reverse(
+            'admin:core_user_change', args=[cls.user.id]
+        )
+
+    def setUp(self):
+        """
+        Create client.
+        """
+        self.client = Client()
+        self.client.force_login(self.admin_user)
 
     def test_users_list(self):
         """Test that users are listed on page."""
-        url = reverse('admin:core_user_changelist')
-        response = self.client.get(url)
+        response = self.client.get(USERS_URL)
 
         self.assertContains(response, self.user.name)
         self.assertContains(response, self.user.email)
 
     def test_edit_user_page(self):
         """Test the edit user page works."""
-        url = reverse('admin:core_user_change', args=[self.user.id])
-        res = self.client.get(url)
+        res = self.client.get(self.change_user_url)
 
         self.assertEqual(res.status_code, 200)  # page loads successfully
 
     def test_create_user_page(self):
         """Test the create user page works."""
-        url = reverse('admin:core_user_add')
-        res = self.client.get(url)
+        res = self.client.get(ADD_USER_URL)
 
         self.assertEqual(res.status_code, 200)  # page loads successfully
@@ -4,6 +4,7 @@ Tests for models.
 from unittest.mock import patch
 from decimal import Decimal
 
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -73,6 +74,25 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(recipe), recipe.title)
 
+    def test_recipes_for_user(self):
+        """Test for_user returns only the user's recipes."""
+        user = create_user()
+        other_user = create_user(email='other@example.com')
+        recipe = models.Recipe.objects.create(
+            user=user,
+            title='Sample recipe name',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+        models.Recipe.objects.create(
+            user=other_user,
+            title='Other recipe name',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+
+        self.assertEqual(list(models.Recipe.objects.for_user(user)), [recipe])
+
     def test_create_tag(self):
         """Test creating a tag is successful."""
         user = create_user()
@@ -90,6 +110,14 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(ingredient), ingredient.name)
 
+    def test_tag_name_unique_per_user(self):
+        """Test a user cannot have two tags with the same name."""
+        user = create_user()
+        models.Tag.objects.create(user=user, name='Sample Tag')
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name='Sample Tag')
+
     @patch('core.models.uuid.uuid4')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test generating image path."""
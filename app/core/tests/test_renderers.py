@@ -0,0 +1,60 @@
+"""
+Tests for renderers and parsers.
+"""
+import io
+import json
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test rendering JSON with orjson."""
+
+    def test_render_matches_json(self):
+        """Test rendered output decodes to the same data."""
+        data = {'id': 1, 'title': 'Sample', 'tags': [{'id': 2, 'name': 'A'}]}
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(json.loads(rendered), data)
+
+    def test_render_falls_back_to_drf_encoder(self):
+        """Test types orjson does not know are encoded like DRF does."""
+        data = {'price': Decimal('5.50'), 'detail': gettext_lazy('Sample')}
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(
+            json.loads(rendered),
+            {'price': 5.5, 'detail': 'Sample'},
+        )
+
+    def test_render_escapes_line_separators(self):
+        """Test output stays a strict javascript subset."""
+        rendered = ORJSONRenderer().render({'name': 'a\u2028b\u2029c'})
+
+        self.assertEqual(rendered, b'{"name":"a\\u2028b\\u2029c"}')
+
+    def test_render_none(self):
+        """Test rendering no data returns an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test parsing JSON with orjson."""
+
+    def test_parse(self):
+        """Test parsing a JSON body."""
+        data = ORJSONParser().parse(io.BytesIO(b'{"name": "Sample"}'))
+
+        self.assertEqual(data, {'name': 'Sample'})
+
+    def test_parse_invalid_json_error(self):
+        """Test invalid JSON raises a parse error."""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
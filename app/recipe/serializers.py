@@ -1,8 +1,16 @@
 """
 Serializers for recipe APIs.
 """
+import copy
+
+from django.db import connection, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.translation import gettext as _
+
 from rest_framework import serializers
 
+from drf_spectacular.utils import extend_schema_field
+
 from core.models import (
     Recipe,
     Tag,
@@ -10,7 +18,191 @@ from core.models import (
 )
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+def _copy_field(field):
+    """Return an unbound shallow copy of a cached serializer field."""
+    field = copy.copy(field)
+    child = getattr(field, 'child', None)
+    if child is not None:
+        # nested list serializers share their child otherwise, so give the
+        # copy its own child and let it rebuild its fields on first access
+        child = copy.copy(child)
+        child.__dict__.pop('fields', None)
+        child.parent = field
+        field.child = child
+
+    return field
+
+
+class CachedFieldsMixin:
+    """Build the fields once per serializer class instead of per instance.
+
+    DRF deep copies every declared field whenever a serializer is
+    instantiated, which dominates the cost of nested serializers.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        """Return fresh copies of the cached fields for this class."""
+        cls = type(self)
+        if cls not in self._fields_cache:
+            self._fields_cache[cls] = super().get_fields()
+
+        return {
+            name: _copy_field(field)
+            for name, field in self._fields_cache[cls].items()
+        }
+
+
+class PlainDictMixin:
+    """Represent objects as plain dicts rather than OrderedDicts.
+
+    Dicts keep insertion order and pickle considerably faster, which
+    matters once serialized output is cached.
+    """
+
+    def to_representation(self, instance):
+        """Return the representation of the instance as a dict."""
+        return dict(super().to_representation(instance))
+
+
+class UniqueNameMixin:
+    """Keep tag-like names unique per user when they are renamed."""
+
+    def validate_name(self, value):
+        """Reject renaming to a name the user already has."""
+        if self.instance is not None:
+            model = self.Meta.model
+            duplicate = model.objects.filter(
+                user=self.context['request'].user,
+                name=value,
+            ).exclude(pk=self.instance.pk)
+            if duplicate.exists():
+                msg = _('An item with this name already exists.')
+                raise serializers.ValidationError(msg, code='unique')
+
+        return value
+
+
+def _bulk_get_or_create(user, items_by_model, cache):
+    """Get or create tag-like objects by name in a single query.
+
+    Every table gets an INSERT ... ON CONFLICT DO UPDATE ... RETURNING in
+    its own CTE, so existing and new rows come back from one round trip
+    without a SELECT beforehand or a savepoint per row. Names already in
+    the cache, keyed by (model label, user id, name), are not queried; the
+    cache itself is left to the caller to fill once the rows are committed.
+
+    Returns a dict mapping each model to a dict of name to id.
+    """
+    quote = connection.ops.quote_name
+    found = {model: {} for model in items_by_model}
+    ctes, selects, params, labels = [], [], [], []
+    for model, items in items_by_model.items():
+        names = []
+        # a fixed order makes concurrent writers lock the rows in the same
+        # order, so they cannot deadlock on each other
+        for name in sorted({item['name'] for item in items}):
+            key = (model._meta.label, user.id, name)
+            if key in cache:
+                found[model][name] = cache[key]
+            else:
+                names.append(name)
+        if not names:
+            continue
+        cte = quote(f'{model._meta.model_name}_rows')
+        ctes.append(
+            f'{cte} AS (INSERT INTO {quote(model._meta.db_table)} '
+            '("user_id", "name") VALUES '
+            + ', '.join(['(%s, %s)'] * len(names))
+            + ' ON CONFLICT ("user_id", "name") '
+            'DO UPDATE SET "name" = EXCLUDED."name" '
+            'RETURNING "id", "name")'
+        )
+        selects.append(f'SELECT %s, "id", "name" FROM {cte}')
+        params.extend(value for name in names for value in (user.id, name))
+        labels.append(model._meta.label)
+    if not ctes:
+        return found
+
+    models_by_label = {model._meta.label: model for model in items_by_model}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'WITH ' + ', '.join(ctes) + ' ' + ' UNION ALL '.join(selects),
+            params + labels,
+        )
+        for label, pk, name in cursor.fetchall():
+            found[models_by_label[label]][name] = pk
+
+    return found
+
+
+def _request_cache(request):
+    """Return the ids of tag-like objects resolved during this request."""
+    if not hasattr(request, '_recipe_attr_ids'):
+        request._recipe_attr_ids = {}
+
+    return request._recipe_attr_ids
+
+
+def _bulk_link(request, recipes, tags_per_recipe, ingredients_per_recipe):
+    """Link recipes to their tags and ingredients, creating missing ones.
+
+    The recipes must not be linked to any tags or ingredients yet.
+    """
+    if not any(tags_per_recipe) and not any(ingredients_per_recipe):
+        return
+
+    relations = [
+        (Tag, Recipe.tags.through, tags_per_recipe),
+        (Ingredient, Recipe.ingredients.through, ingredients_per_recipe),
+    ]
+    cache = _request_cache(request)
+    with transaction.atomic():
+        ids = _bulk_get_or_create(request.user, {
+            model: [item for items in items_per_recipe for item in items]
+            for model, _through, items_per_recipe in relations
+        }, cache)
+        for model, through, items_per_recipe in relations:
+            field_name = f'{model._meta.model_name}_id'
+            rows = {
+                (recipe.id, ids[model][item['name']])
+                for recipe, items in zip(recipes, items_per_recipe)
+                for item in items
+            }
+            # one INSERT into the through table instead of add()
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{field_name: obj_id})
+                for recipe_id, obj_id in rows
+            ])
+    # only remember the ids once nothing can roll their rows back
+    cache.update(
+        ((model._meta.label, request.user.id, name), pk)
+        for model, pks in ids.items()
+        for name, pk in pks.items()
+    )
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for creating several recipes in one request."""
+
+    def create(self, validated_data):
+        """Create recipes with their tags and ingredients in bulk."""
+        tags = [attrs.pop('tags', []) for attrs in validated_data]
+        ingredients = [
+            attrs.pop('ingredients', []) for attrs in validated_data
+        ]
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(**attrs) for attrs in validated_data]
+        )
+        _bulk_link(self.context['request'], recipes, tags, ingredients)
+        # load the relations back for the response in two queries
+        prefetch_related_objects(recipes, 'tags', 'ingredients')
+
+        return recipes
+
+
+class IngredientSerializer(CachedFieldsMixin, UniqueNameMixin,
+                           serializers.ModelSerializer):
     """Serializer for ingredients."""
 
     class Meta:
@@ -18,8 +210,13 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']  # the fields we want to make accessible
         read_only_fields = ['id']
 
+    def to_representation(self, instance):
+        """Return the fixed id and name fields without DRF field lookups."""
+        return {'id': instance.id, 'name': instance.name}
+
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(CachedFieldsMixin, UniqueNameMixin,
+                    serializers.ModelSerializer):
     """Serializer for tag objects."""
 
     class Meta:
@@ -27,8 +224,13 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
         read_only_fields = ['id']
 
+    def to_representation(self, instance):
+        """Return the fixed id and name fields without DRF field lookups."""
+        return {'id': instance.id, 'name': instance.name}
+
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(CachedFieldsMixin, PlainDictMixin,
+                       serializers.ModelSerializer):
     """Serializers for recipes."""
     # many=True because it's a many-to-many field
     tags = TagSerializer(many=True, required=False)
@@ -41,27 +243,12 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients'
         ]  # tag is nested serializer, default is read only
         read_only_fields = ['id']
+        # used instead of ListSerializer when many=True
+        list_serializer_class = RecipeListSerializer
 
-    def _get_or_create_tags(self, tags, recipe):
-        """Handle getting or creatinhg tags as needed."""
-        auth_user = self.context['request'].user
-        for tag in tags:  # create nested tags field by hand
-            tab_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tab_obj)
-
-    # internal method, can not be called from outside
-    def _get_or_create_ingredients(self, ingredients, recipe):
-        """Handle getting or creating ingredients as needed."""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+    def _bulk_resolve(self, recipe, tags, ingredients):
+        """Get or create tags and ingredients and add them to the recipe."""
+        _bulk_link(self.context['request'], [recipe], [tags], [ingredients])
 
     def create(self, validated_data):
         """Create a recipe"""
@@ -69,8 +256,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         # default is empty list, if no tags provided
         ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredients(ingredients, recipe)
+        self._bulk_resolve(recipe, tags, ingredients)
 
         return recipe
 
@@ -80,15 +266,17 @@ class RecipeSerializer(serializers.ModelSerializer):
         ingredients = validated_data.pop('ingredients', None)
         if tags is not None:
             instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
         if ingredients is not None:
             instance.ingredients.clear()  # clear all ingredients
-            self._get_or_create_ingredients(ingredients, instance)
+        self._bulk_resolve(instance, tags or [], ingredients or [])
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)  # set attribute on instance
 
-        instance.save()
+        if validated_data:
+            # only write the changed columns; save() also commits files
+            instance.save(update_fields=list(validated_data))
+
         return instance
 
 
@@ -100,6 +288,39 @@ class RecipeDetailSerializer(RecipeSerializer):
         read_only_fields = RecipeSerializer.Meta.read_only_fields
 
 
+class RecipeReadSerializer(RecipeSerializer):
+    """Serializer for listing recipes.
+
+    Renders tags and ingredients straight from the prefetched relations
+    instead of instantiating nested serializers for every request.
+    """
+    tags = serializers.SerializerMethodField()
+    ingredients = serializers.SerializerMethodField()
+
+    @extend_schema_field(TagSerializer(many=True))
+    def get_tags(self, instance):
+        """Return the tags of the recipe."""
+        return [
+            {'id': tag.id, 'name': tag.name} for tag in instance.tags.all()
+        ]
+
+    @extend_schema_field(IngredientSerializer(many=True))
+    def get_ingredients(self, instance):
+        """Return the ingredients of the recipe."""
+        return [
+            {'id': ingredient.id, 'name': ingredient.name}
+            for ingredient in instance.ingredients.all()
+        ]
+
+
+class RecipeDetailReadSerializer(RecipeReadSerializer):
+    """Serializer for retrieving a single recipe."""
+
+    class Meta(RecipeReadSerializer.Meta):
+        fields = RecipeDetailSerializer.Meta.fields
+        read_only_fields = RecipeDetailSerializer.Meta.read_only_fields
+
+
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading images to recipes."""
 
@@ -2,8 +2,8 @@
 Tests for the ingredients API endpoint.
 """
 from django.contrib.auth import get_user_model
-from django.urls import reverse
-from django.test import TestCase
+from django.urls import reverse, reverse_lazy
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -12,7 +12,7 @@ from core.models import Ingredient
 
 from recipe.serializers import IngredientSerializer
 
-INGREDIENTS_URL = reverse('recipe:ingredient-list')
+INGREDIENTS_URL = reverse_lazy('recipe:ingredient-list')
 
 
 def detail_url(ingredient_id):
@@ -20,16 +20,25 @@ def detail_url(ingredient_id):
     return reverse('recipe:ingredient-detail', args=[ingredient_id])
 
 
-def create_user(email='user@example.com', password='test123'):
+def create_user(email='user@example.com'):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(email, password)
+    user = get_user_model()(email=email)
+    user.set_unusable_password()
+    user.save()
 
+    return user
 
-class PublicIngredientsApiTests(TestCase):
-    """Test unauthenticated API requests."""
 
-    def setUp(self):
-        self.client = APIClient()
+def bulk_create_ingredients(user, names):
+    """Create and return ingredients for a user with a single INSERT."""
+    return Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names]
+    )
+
+
+class PublicIngredientsApiTests(SimpleTestCase):
+    """Test unauthenticated API requests."""
+    client_class = APIClient
 
     def test_login_required(self):
         """Test authentication is required for retrieving ingredients."""
@@ -40,20 +49,23 @@ class PublicIngredientsApiTests(TestCase):
 
 class PrivateIngredientsApiTests(TestCase):
     """Test authenticated API requests."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
 
     def setUp(self):
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_ingredients(self):
         """Test retrieving a list of ingredients."""
         # Create some sample ingredients
-        Ingredient.objects.create(user=self.user, name='Kale')
-        Ingredient.objects.create(user=self.user, name='Salt')
+        bulk_create_ingredients(self.user, ['Kale', 'Salt'])
 
         # Make a request to retrieve ingredient lists
-        res = self.client.get(INGREDIENTS_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENTS_URL)
 
         # Get all ingredients from the database
         ingredients = Ingredient.objects.all().order_by('-name')
@@ -62,15 +74,17 @@ class PrivateIngredientsApiTests(TestCase):
         # Check that the response is correct
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         # API response data == serializer data
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test list of ingredients is limited to authenticated user."""
         # Create a new unauthenticated user
         user2 = create_user(email='user2@example.com')
         # Create some sample ingredients
-        Ingredient.objects.create(user=user2, name='Vinegar')
-        ingredient = Ingredient.objects.create(user=self.user, name='Tumeric')
+        _, ingredient = Ingredient.objects.bulk_create([
+            Ingredient(user=user2, name='Vinegar'),
+            Ingredient(user=self.user, name='Tumeric'),
+        ])
 
         # Make a request to retrieve ingredient lists
         res = self.client.get(INGREDIENTS_URL)
@@ -79,9 +93,9 @@ class PrivateIngredientsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         # Check that the response contains only the ingredient created by the
         # authenticated user
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
-        self.assertEqual(res.data[0]['id'], ingredient.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
+        self.assertEqual(res.data['results'][0]['id'], ingredient.id)
 
     def test_update_ingredient(self):
         """Test updating an ingredient."""
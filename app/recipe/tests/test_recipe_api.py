@@ -2,6 +2,7 @@
 Tests for recipe APIs.
 """
 from decimal import Decimal
+from unittest.mock import patch
 import tempfile
 import os
 
@@ -9,11 +10,13 @@ import os
 from PIL import Image
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from django.urls import reverse
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
 
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
 from core.models import (
     Recipe,
@@ -24,9 +27,11 @@ from core.models import (
 from recipe.serializers import (
     RecipeSerializer,
     RecipeDetailSerializer,
+    RecipeReadSerializer,
+    _bulk_link,
 )
 
-RECIPES_URL = reverse('recipe:recipe-list')
+RECIPES_URL = reverse_lazy('recipe:recipe-list')
 
 
 def detail_url(recipe_id):
@@ -57,14 +62,16 @@ def create_recipe(user, **params):
 
 def create_user(**params):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
+    user = get_user_model()(**params)
+    user.set_unusable_password()
+    user.save()
 
+    return user
 
-class PublicRecipeAPITests(TestCase):
-    """Test unauthenticated recipe API access."""
 
-    def setUp(self):
-        self.client = APIClient()
+class PublicRecipeAPITests(SimpleTestCase):
+    """Test unauthenticated recipe API access."""
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test that authentication is required to call API."""
@@ -73,12 +80,102 @@ class PublicRecipeAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class RecipeSerializerTests(TestCase):
+    """Test recipe serializer internals."""
+
+    def test_fields_not_shared_between_instances(self):
+        """Test each serializer gets its own bound copy of the fields."""
+        serializer1 = RecipeSerializer()
+        serializer2 = RecipeSerializer(partial=True)
+
+        tags1 = serializer1.fields['tags']
+        tags2 = serializer2.fields['tags']
+        self.assertIsNot(tags1, tags2)
+        self.assertIsNot(tags1.child, tags2.child)
+        # nested fields resolve the root of their own serializer
+        self.assertIs(tags1.child.fields['name'].root, serializer1)
+        self.assertIs(tags2.child.fields['name'].root, serializer2)
+
+    def test_representation_is_plain_dict(self):
+        """Test recipes and nested objects serialize to plain dicts."""
+        user = create_user(email='user@example.com')
+        recipe = create_recipe(user=user)
+        recipe.tags.add(Tag.objects.create(user=user, name='Vegan'))
+
+        data = RecipeSerializer().to_representation(recipe)
+
+        self.assertIs(type(data), dict)
+        self.assertIs(type(data['tags'][0]), dict)
+
+    def test_read_serializer_matches_nested_serializer(self):
+        """Test the read serializer renders the same data as the nested one."""
+        user = create_user(email='user@example.com')
+        recipe = create_recipe(user=user)
+        recipe.tags.add(Tag.objects.create(user=user, name='Vegan'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=user, name='Kale'),
+            Ingredient.objects.create(user=user, name='Salt'),
+        )
+
+        self.assertEqual(
+            RecipeReadSerializer(recipe).data,
+            RecipeSerializer(recipe).data,
+        )
+
+    def test_tags_resolved_once_per_request(self):
+        """Test tags already resolved in a request are not queried again."""
+        user = create_user(email='user@example.com')
+        request = APIRequestFactory().post(RECIPES_URL)
+        request.user = user
+        payload = {
+            'title': 'Thai Prawn Curry',
+            'time_minutes': 20,
+            'price': Decimal('7.00'),
+            'tags': [{'name': 'Thai'}],
+        }
+        for expect_upsert in [True, False]:
+            serializer = RecipeSerializer(
+                data=payload,
+                context={'request': request},
+            )
+            serializer.is_valid(raise_exception=True)
+            with CaptureQueriesContext(connection) as queries:
+                recipe = serializer.save(user=user)
+
+            upserts = [q for q in queries if 'core_tag' in q['sql']]
+            self.assertEqual(bool(upserts), expect_upsert)
+            self.assertEqual(
+                list(recipe.tags.values_list('name', flat=True)),
+                ['Thai'],
+            )
+
+    def test_tags_not_cached_when_rolled_back(self):
+        """Test ids of rolled back tags are not reused in the request."""
+        user = create_user(email='user@example.com')
+        request = APIRequestFactory().post(RECIPES_URL)
+        request.user = user
+        recipe = create_recipe(user=user)
+        through = Recipe.tags.through
+
+        with patch.object(
+            through.objects, 'bulk_create', side_effect=IntegrityError,
+        ):
+            with self.assertRaises(IntegrityError):
+                _bulk_link(request, [recipe], [[{'name': 'Thai'}]], [[]])
+
+        self.assertEqual(request._recipe_attr_ids, {})
+        self.assertFalse(Tag.objects.filter(user=user).exists())
+
+
 class PrivateRecipeAPITests(TestCase):
     """Test authenticated recipe API access."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(email='user@example.com')
 
     def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(email='user@example.com', password='test123')
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
@@ -86,7 +183,9 @@ class PrivateRecipeAPITests(TestCase):
         create_recipe(user=self.user)
         create_recipe(user=self.user)
 
-        response = self.client.get(RECIPES_URL)
+        # recipes + prefetched tags + prefetched ingredients
+        with self.assertNumQueries(3):
+            response = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.all().order_by('-id')
         # Note: many=True is required when serializing a queryset.
@@ -94,12 +193,29 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    def test_retrieve_recipes_query_count(self):
+        """Test listing recipes takes the same queries for any number."""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Kale')
+        for _ in range(20):
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+
+        # recipes + prefetched tags + prefetched ingredients
+        with self.assertNumQueries(3):
+            response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[0]['tags'][0]['name'], tag.name)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
-        other_user = create_user(email='other@example.com',
-                                 password='password123')
+        other_user = create_user(email='other@example.com')
         create_recipe(user=other_user)
         create_recipe(user=self.user)
 
@@ -108,7 +224,7 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get recipe detail."""
@@ -136,6 +252,70 @@ class PrivateRecipeAPITests(TestCase):
             self.assertEqual(getattr(recipe, k), v)
         self.assertEqual(recipe.user, self.user)
 
+    def test_create_recipes_in_bulk(self):
+        """Test creating several recipes in one request."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        payload = [
+            {
+                'title': 'Thai Prawn Curry',
+                'time_minutes': 20,
+                'price': Decimal('7.00'),
+                'tags': [{'name': 'Dinner'}, {'name': 'Thai'}],
+                'ingredients': [{'name': 'Prawn'}],
+            },
+            {
+                'title': 'Green Curry',
+                'time_minutes': 25,
+                'price': Decimal('6.50'),
+                'tags': [{'name': 'Thai'}],
+                'ingredients': [{'name': 'Prawn'}, {'name': 'Basil'}],
+            },
+        ]
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        for item in payload:
+            recipe = Recipe.objects.get(user=self.user, title=item['title'])
+            self.assertEqual(recipe.price, item['price'])
+            self.assertEqual(
+                set(recipe.tags.values_list('name', flat=True)),
+                {t['name'] for t in item['tags']},
+            )
+            self.assertEqual(
+                set(recipe.ingredients.values_list('name', flat=True)),
+                {i['name'] for i in item['ingredients']},
+            )
+        # shared names are created once and existing ones are reused
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 2)
+        recipe = Recipe.objects.get(title='Thai Prawn Curry')
+        self.assertIn(tag, recipe.tags.all())
+
+    def test_update_with_list_error(self):
+        """Test updating a recipe with a list of recipes is rejected."""
+        recipe = create_recipe(user=self.user)
+        payload = [{'title': 'New recipe title'}]
+        url = detail_url(recipe.id)
+
+        for method in (self.client.patch, self.client.put):
+            res = method(url, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Sample recipe title')
+
+    def test_partial_update_query_count(self):
+        """Test a partial update does not prefetch relations it discards."""
+        recipe = create_recipe(user=self.user)
+        url = detail_url(recipe.id)
+
+        # fetch, update, then tags and ingredients for the response
+        with self.assertNumQueries(4):
+            res = self.client.patch(url, {'title': 'New recipe title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_partial_update(self):
         """Test partial update of a recipe."""
         original_link = 'https://example.com/recipe.pdf'
@@ -184,7 +364,7 @@ class PrivateRecipeAPITests(TestCase):
 
     def test_update_user_returns_error(self):
         """Test changing the recipe user results in an error."""
-        new_user = create_user(email='user2@example.com', password='test123')
+        new_user = create_user(email='user2@example.com')
         recipe = create_recipe(user=self.user)
 
         payload = {'user': new_user.id}
@@ -207,7 +387,7 @@ class PrivateRecipeAPITests(TestCase):
 
     def test_recipe_other_users_recipe_error(self):
         """Test trying to delete another users recipe gives error."""
-        new_user = create_user(email='user2@example.com', password='test123')
+        new_user = create_user(email='user2@example.com')
         recipe = create_recipe(user=new_user)
 
         url = detail_url(recipe.id)
@@ -230,17 +410,16 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         # get all recipes belonging to the user
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        # a single query fetches the recipes for both checks below
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]  # get the first recipe
         # check if 2 tags are created
         self.assertEqual(recipe.tags.count(), 2)
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+        names = set(recipe.tags.filter(
+            user=self.user,
+        ).values_list('name', flat=True))
+        self.assertEqual(names, {t['name'] for t in payload['tags']})
 
     def test_create_recipe_with_existing_tags(self):
         """Test creating a recipe with existing tags."""
@@ -256,19 +435,18 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         # get all recipes belonging to the user
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        # a single query fetches the recipes for both checks below
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]  # get the first recipe
         # check if 2 tags are created (1 existing, 1 new)
         self.assertEqual(recipe.tags.count(), 2)
         # check if existing tag is in recipe tags
         self.assertIn(tag_indian, recipe.tags.all())
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+        names = set(recipe.tags.filter(
+            user=self.user,
+        ).values_list('name', flat=True))
+        self.assertEqual(names, {t['name'] for t in payload['tags']})
 
     def test_create_tag_on_update(self):
         """Test creating a tag when updating a recipe."""
@@ -335,19 +513,18 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         # get all recipes belonging to the user
-        recipes = Recipe.objects.filter(user=self.user)
+        # a single query fetches the recipes for both checks below
+        recipes = list(Recipe.objects.filter(user=self.user))
         # only 1 recipe is created for the user
-        self.assertEqual(recipes.count(), 1)
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]  # get the first recipe
         # check if 2 ingredients are created
         self.assertEqual(recipe.ingredients.count(), 2)
         # check each ingredient is created
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+        names = set(recipe.ingredients.filter(
+            user=self.user,
+        ).values_list('name', flat=True))
+        self.assertEqual(names, {i['name'] for i in payload['ingredients']})
 
     def test_create_recipe_with_existing_ingredient(self):
         """Test creating a new recipe with existing ingredients."""
@@ -363,20 +540,19 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         # get all recipes belonging to the user
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        # a single query fetches the recipes for both checks below
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]  # get the first recipe
         # check if no duplicated ingredients are created
         self.assertEqual(recipe.ingredients.count(), 2)
         # check if existing ingredient is in recipe ingredients
         self.assertIn(ingredient, recipe.ingredients.all())
         # check each ingredient is created (in the database)
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user,
-            ).exists()
-            self.assertTrue(exists)
+        names = set(recipe.ingredients.filter(
+            user=self.user,
+        ).values_list('name', flat=True))
+        self.assertEqual(names, {i['name'] for i in payload['ingredients']})
 
     def test_create_ingredient_on_update(self):
         """Test creating an ingredient when updating a recipe."""
@@ -433,10 +609,13 @@ class PrivateRecipeAPITests(TestCase):
 
 class ImageUploadTests(TestCase):
     """Test image upload API."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(email='user@example.com')
 
     def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(email='user@example.com', password='test123')
         self.client.force_authenticate(self.user)
         self.recipe = create_recipe(user=self.user)
 
@@ -460,6 +639,21 @@ class ImageUploadTests(TestCase):
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_update_image(self):
+        """Test updating a recipe's image through the detail endpoint."""
+        url = detail_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            img = Image.new('RGB', (10, 10))
+            img.save(image_file, format='JPEG')
+            image_file.seek(0)
+            payload = {'image': image_file}
+            res = self.client.patch(url, payload, format='multipart')
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.recipe.image.name.startswith('uploads/recipe/'))
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+
     def test_upload_image_bad_request(self):
         """Test uploading invalid image."""
         url = image_upload_url(self.recipe.id)
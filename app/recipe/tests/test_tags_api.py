@@ -2,10 +2,11 @@
 Tests for the tags API endpoint.
 """
 from django.contrib.auth import get_user_model
-from django.urls import reverse
-from django.test import TestCase
+from django.urls import reverse, reverse_lazy
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 from core.models import Tag
@@ -13,7 +14,7 @@ from core.models import Tag
 from recipe.serializers import TagSerializer
 
 
-TAGS_URL = reverse('recipe:tag-list')
+TAGS_URL = reverse_lazy('recipe:tag-list')
 
 
 def detail_url(tag_id):
@@ -21,16 +22,25 @@ def detail_url(tag_id):
     return reverse('recipe:tag-detail', args=[tag_id])
 
 
-def create_user(email='user@example.com', password='test123'):
+def create_user(email='user@example.com'):
     """Create and return a new user."""
-    return get_user_model().objects.create_user(email, password)
+    user = get_user_model()(email=email)
+    user.set_unusable_password()
+    user.save()
 
+    return user
 
-class PublicTagsApiTests(TestCase):
-    """Test unauthenticated tags API access."""
 
-    def setUp(self):
-        self.client = APIClient()
+def bulk_create_tags(user, names):
+    """Create and return tags for a user with a single INSERT."""
+    return Tag.objects.bulk_create(
+        [Tag(user=user, name=name) for name in names]
+    )
+
+
+class PublicTagsApiTests(SimpleTestCase):
+    """Test unauthenticated tags API access."""
+    client_class = APIClient
 
     def test_login_required(self):
         """Test that login is required for retrieving tags."""
@@ -41,23 +51,62 @@ class PublicTagsApiTests(TestCase):
 
 class PrivateTagsApiTests(TestCase):
     """Test the authenticated API requests."""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
 
     def setUp(self):
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
         """Test retrieving tags."""
-        Tag.objects.create(user=self.user, name='Vegan')
-        Tag.objects.create(user=self.user, name='Dessert')
+        bulk_create_tags(self.user, ['Vegan', 'Dessert'])
 
-        response = self.client.get(TAGS_URL)
+        with self.assertNumQueries(1):
+            response = self.client.get(TAGS_URL)
 
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)  # list of objects
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    def test_retrieve_tags_query_count(self):
+        """Test listing tags takes one query regardless of their number."""
+        bulk_create_tags(self.user, [f'Tag {i}' for i in range(50)])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_retrieve_tags_paginated(self):
+        """Test tags are listed a page at a time."""
+        bulk_create_tags(self.user, [f'Tag {i:02}' for i in range(60)])
+
+        response = self.client.get(TAGS_URL)
+        next_response = self.client.get(response.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 50)
+        self.assertEqual(response.data['results'][0]['name'], 'Tag 59')
+        self.assertEqual(len(next_response.data['results']), 10)
+        self.assertEqual(next_response.data['results'][-1]['name'], 'Tag 00')
+        self.assertIsNone(next_response.data['next'])
+
+    def test_retrieve_tags_with_token(self):
+        """Test the tags API accepts the user's auth token."""
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        bulk_create_tags(self.user, ['Vegan'])
+
+        response = client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Vegan')
 
     def test_tags_limited_to_user(self):
         """Test list of tags is limited to authenticated user."""
@@ -68,9 +117,9 @@ class PrivateTagsApiTests(TestCase):
         response = self.client.get(TAGS_URL)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # only one tag
-        self.assertEqual(response.data[0]['name'], tag.name)
-        self.assertEqual(response.data[0]['id'], tag.id)
+        self.assertEqual(len(response.data['results']), 1)  # only one tag
+        self.assertEqual(response.data['results'][0]['name'], tag.name)
+        self.assertEqual(response.data['results'][0]['id'], tag.id)
 
     def test_update_tag(self):
         """Test updating a tag."""
@@ -86,6 +135,19 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(tag.name, payload['name'])  # name updated
         self.assertEqual(tag.user, self.user)  # user unchanged
 
+    def test_update_tag_duplicate_name_error(self):
+        """Test renaming a tag to an existing name returns an error."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        tag = Tag.objects.create(user=self.user, name='Old Tag')
+
+        payload = {'name': 'Vegan'}
+        url = detail_url(tag.id)
+        res = self.client.patch(url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Old Tag')
+
     def test_delete_tag(self):
         """Test deleting a tag."""
         tag = Tag.objects.create(user=self.user, name='Old Tag')
@@ -7,6 +7,7 @@ from rest_framework import (
     status,
 )
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
@@ -19,26 +20,61 @@ from core.models import (
 from recipe import serializers
 
 
+# cursor pagination filters on the ordering column instead of using
+# OFFSET and never runs a COUNT query
+class RecipePagination(CursorPagination):
+    """Paginate recipes, newest first."""
+    page_size = 50
+    ordering = '-id'
+
+
+class RecipeAttrPagination(RecipePagination):
+    """Paginate recipe attributes by name."""
+    ordering = '-name'
+
+
 class RecipeViewSet(viewsets.ModelViewSet):
     """View for manage recipe APIs."""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
+    pagination_class = RecipePagination
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Return recipes for the current authenticated user only."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = Recipe.objects.for_user(self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # only reads render the relations; updates refetch them anyway
+            queryset = queryset.select_related('user').prefetch_related(
+                'tags', 'ingredients',
+            )
+        if self.action == 'list':
+            # the list serializer leaves out description and image
+            queryset = queryset.only(
+                'id', 'title', 'time_minutes', 'price', 'link', 'user',
+            )
+
+        return queryset.order_by('-id')
 
     def get_serializer_class(self):
         """Return serializer class for request action."""
         if self.action == 'list':
-            return serializers.RecipeSerializer
+            return serializers.RecipeReadSerializer
+        elif self.action == 'retrieve':
+            return serializers.RecipeDetailReadSerializer
         elif self.action == 'upload_image':
             return serializers.RecipeImageSerializer
 
         return self.serializer_class
 
+    def get_serializer(self, *args, **kwargs):
+        """Accept a list of recipes to create them in bulk."""
+        if self.action == 'create' and isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
@@ -72,6 +108,7 @@ class BaseRecipeAttrViewSet(mixins.DestroyModelMixin,
                             mixins.ListModelMixin,
                             viewsets.GenericViewSet):
     """Base viewset for recipe attributes."""
+    pagination_class = RecipeAttrPagination
     # available authentication methods
     authentication_classes = [TokenAuthentication]
     # only authenticated users can access
@@ -79,7 +116,11 @@ class BaseRecipeAttrViewSet(mixins.DestroyModelMixin,
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        # the serializers only expose id and name, so skip the other columns;
+        # nothing reads the user, so there is no need to select_related it
+        return self.queryset.filter(
+            user=self.request.user
+        ).only('id', 'name').order_by('-name')
 
 
 class TagViewSet(BaseRecipeAttrViewSet):